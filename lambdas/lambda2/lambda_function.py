@@ -3,16 +3,72 @@ Weather Outerwear Recommendation - Open-Meteo API
 GET /api/v1/weather?city=Toronto
 """
 
-import json
-import urllib.request
-import urllib.parse
+import bisect
+import functools
 import time
-from datetime import datetime
+import urllib.parse
 from typing import Optional
 
+import urllib3
+
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    _loads = orjson.loads
+    _JSON_FALLBACK = False
+except ImportError:  # pragma: no cover - orjson ships in the deployment zip
+    import json
+
+    _dumps = json.dumps
+    _loads = json.loads
+    _JSON_FALLBACK = True
+
 GEOCODING_URL = "https://geocoding-api.open-meteo.com/v1/search"
 WEATHER_URL = "https://api.open-meteo.com/v1/forecast"
-MAX_RETRIES = 3
+_GEOCODING_URL_TMPL = GEOCODING_URL + "?count=1&name={name}"
+_WEATHER_URL_TMPL = (
+    WEATHER_URL
+    + "?current=temperature_2m,precipitation_probability"
+    + "&latitude={lat}&longitude={lon}"
+)
+MAX_RETRIES = 3  # total attempts per request
+# Per-attempt cap; 3 attempts plus 1s of backoff for both upstream calls
+# stays under the 20s Lambda timeout
+REQUEST_TIMEOUT = urllib3.Timeout(total=2.5)
+WEATHER_CACHE_TTL = 120  # seconds
+WEATHER_CACHE_SIZE = 1024
+
+_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*",
+}
+
+# Upper bounds (exclusive) of each temperature band, and the outerwear for
+# each band indexed as [band][needs rain jacket]
+_TEMPERATURE_THRESHOLDS = (0, 10, 16)
+_OUTERWEAR_TABLE = (
+    (("winter coat",), ("winter coat", "rain jacket")),
+    (("light jacket",), ("light jacket", "rain jacket")),
+    (("hoodie",), ("hoodie", "rain jacket")),
+    ((), ("rain jacket",)),
+)
+
+_weather_cache: dict[tuple[float, float], tuple[float, dict]] = {}
+
+# Created at cold start so warm invocations reuse keep-alive TLS connections
+_http = urllib3.PoolManager(
+    num_pools=2,
+    maxsize=4,
+    retries=urllib3.Retry(
+        total=MAX_RETRIES - 1,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        respect_retry_after_header=False,
+    ),
+)
 
 
 def log(level: str, message: str, metadata: Optional[dict] = None) -> None:
@@ -24,15 +80,21 @@ def log(level: str, message: str, metadata: Optional[dict] = None) -> None:
         message: Log message
         metadata: Additional context dictionary
     """
+    now = time.time()
+    ts = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(now))
     log_entry = {
-        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'timestamp': f"{ts}.{int(now % 1 * 1e6):06d}Z",
         'level': level,
         'message': message,
         'function': 'PythonFunction'
     }
     if metadata:
         log_entry.update(metadata)
-    print(json.dumps(log_entry))
+    print(_dumps(log_entry))
+
+
+if _JSON_FALLBACK:  # pragma: no cover
+    log('WARN', 'orjson not available, falling back to stdlib json')
 
 
 def response(status_code: int, body: dict) -> dict:
@@ -48,14 +110,33 @@ def response(status_code: int, body: dict) -> dict:
     """
     return {
         "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-        },
-        "body": json.dumps(body),
+        "headers": _HEADERS,
+        # REST API proxy integrations need a str body; base64 would
+        # require binaryMediaTypes on the API
+        "body": _dumps(body),
     }
 
 
+# Static error responses are serialized once at cold start and shared;
+# never mutate them
+_ERR_MISSING_CITY = response(400, {
+    "success": False,
+    "error": "Missing required parameter: city",
+})
+_ERR_CITY_TOO_LONG = response(400, {
+    "success": False,
+    "error": "City name too long (max 100 characters)",
+})
+_ERR_WEATHER_UNAVAILABLE = response(503, {
+    "success": False,
+    "error": "Weather data unavailable",
+})
+_ERR_INTERNAL = response(500, {
+    "success": False,
+    "error": "Internal server error",
+})
+
+
 def fetch_with_retry(url: str) -> dict:
     """
     Fetches URL with exponential backoff retry logic.
@@ -67,31 +148,34 @@ def fetch_with_retry(url: str) -> dict:
         Parsed JSON response
 
     Raises:
-        Exception: If all retry attempts fail
+        Exception: If all retry attempts fail or the response is an HTTP error
     """
-    for attempt in range(MAX_RETRIES):
-        try:
-            with urllib.request.urlopen(url, timeout=10) as res:
-                return json.loads(res.read().decode())
-        except Exception as e:
-            if attempt < MAX_RETRIES - 1:
-                time.sleep(2 ** attempt)
-                continue
-            raise e
+    res = _http.request("GET", url, timeout=REQUEST_TIMEOUT)
+    if res.status >= 400:
+        raise urllib3.exceptions.HTTPError(f"HTTP {res.status} from {url}")
+    return _loads(res.data)
 
 
 def get_coordinates(city: str) -> Optional[dict]:
     """
     Converts city name to GPS coordinates.
 
+    Lookups are cached for the lifetime of the container, keyed by the
+    case-insensitive city name, since coordinates never change.
+
     Args:
         city: City name to geocode
 
     Returns:
         Dictionary with name, country, latitude, longitude or None if not found
     """
-    params = urllib.parse.urlencode({"name": city, "count": 1})
-    url = f"{GEOCODING_URL}?{params}"
+    return _geocode(city.strip().lower())
+
+
+@functools.lru_cache(maxsize=1024)
+def _geocode(city: str) -> Optional[dict]:
+    """Cached geocoding lookup keyed by the normalized city name."""
+    url = _GEOCODING_URL_TMPL.format(name=urllib.parse.quote(city, safe=""))
 
     data = fetch_with_retry(url)
 
@@ -111,6 +195,9 @@ def get_weather(latitude: float, longitude: float) -> dict:
     """
     Fetches current weather conditions.
 
+    Results are cached for WEATHER_CACHE_TTL seconds per ~1km grid cell
+    (coordinates rounded to 2 decimals).
+
     Args:
         latitude: GPS latitude
         longitude: GPS longitude
@@ -118,26 +205,34 @@ def get_weather(latitude: float, longitude: float) -> dict:
     Returns:
         Dictionary with temperature (°C) and precipitation probability (%)
     """
-    params = urllib.parse.urlencode({
-        "latitude": latitude,
-        "longitude": longitude,
-        "current": "temperature_2m,precipitation_probability",
-    })
-    url = f"{WEATHER_URL}?{params}"
+    key = (round(latitude, 2), round(longitude, 2))
+    now = time.monotonic()
+    cached = _weather_cache.get(key)
+    if cached and now - cached[0] < WEATHER_CACHE_TTL:
+        return cached[1]
+
+    url = _WEATHER_URL_TMPL.format(lat=latitude, lon=longitude)
 
     data = fetch_with_retry(url)
 
     current = data.get("current", {})
-    return {
+    weather = {
         "temperature": current.get("temperature_2m"),
         "precipitationProbability": current.get("precipitation_probability"),
     }
 
+    if weather["temperature"] is not None:
+        if len(_weather_cache) >= WEATHER_CACHE_SIZE:
+            _weather_cache.clear()
+        _weather_cache[key] = (now, weather)
+
+    return weather
+
 
 def get_outerwear_recommendations(
     temperature: float,
     precipitation_probability: Optional[float]
-) -> list[str]:
+) -> tuple[str, ...]:
     """
     Determines recommended outerwear based on weather conditions.
 
@@ -154,23 +249,18 @@ def get_outerwear_recommendations(
         precipitation_probability: Chance of precipitation (0-100) or None
 
     Returns:
-        List of recommended outerwear items
+        Tuple of recommended outerwear items
     """
-    recommendations = []
-
     # Temperature-based (mutually exclusive)
-    if temperature < 0:
-        recommendations.append("winter coat")
-    elif temperature < 10:
-        recommendations.append("light jacket")
-    elif temperature < 16:
-        recommendations.append("hoodie")
+    band = bisect.bisect_right(_TEMPERATURE_THRESHOLDS, temperature)
 
     # Rain-based (additive)
-    if precipitation_probability is not None and precipitation_probability > 40:
-        recommendations.append("rain jacket")
+    rain = (
+        precipitation_probability is not None
+        and precipitation_probability > 40
+    )
 
-    return recommendations
+    return _OUTERWEAR_TABLE[band][rain]
 
 
 def lambda_handler(event: dict, context: object) -> dict:
@@ -197,16 +287,10 @@ def lambda_handler(event: dict, context: object) -> dict:
     try:
         # Validation
         if not city:
-            return response(400, {
-                "success": False,
-                "error": "Missing required parameter: city",
-            })
+            return _ERR_MISSING_CITY
         
         if len(city) > 100:
-            return response(400, {
-                "success": False,
-                "error": "City name too long (max 100 characters)",
-            })
+            return _ERR_CITY_TOO_LONG
         
         # Geocoding
         location = get_coordinates(city)
@@ -220,16 +304,7 @@ def lambda_handler(event: dict, context: object) -> dict:
         weather = get_weather(location["latitude"], location["longitude"])
 
         if weather["temperature"] is None:
-            return response(503, {
-                "success": False,
-                "error": "Weather data unavailable",
-            })
-
-        log('INFO', 'Weather API success', {
-            'requestId': request_id,
-            'location': f"{location['name']}, {location['country']}",
-            'temperature': weather['temperature']
-        })
+            return _ERR_WEATHER_UNAVAILABLE
 
         # Recommendations
         recommendations = get_outerwear_recommendations(
@@ -237,16 +312,20 @@ def lambda_handler(event: dict, context: object) -> dict:
             weather["precipitationProbability"]
         )
 
+        location_name = f"{location['name']}, {location['country']}"
+
         log('INFO', 'Request completed', {
             'requestId': request_id,
             'city': city,
+            'location': location_name,
+            'temperature': weather['temperature'],
             'recommendations': recommendations
         })
 
         return response(200, {
             "success": True,
             "data": {
-                "location": f"{location['name']}, {location['country']}",
+                "location": location_name,
                 "temperature": weather["temperature"],
                 "precipitationProbability": weather["precipitationProbability"],
                 "outerwearRecommended": recommendations,
@@ -260,7 +339,4 @@ def lambda_handler(event: dict, context: object) -> dict:
             'city': params.get('city', 'unknown')
         })
 
-        return response(500, {
-            "success": False,
-            "error": "Internal server error",
-        })
\ No newline at end of file
+        return _ERR_INTERNAL
\ No newline at end of file
@@ -4,26 +4,69 @@ Minimal essential tests covering critical paths
 """
 
 import unittest
-from unittest.mock import patch, MagicMock
 import json
+import urllib3
+import lambda_function
 from lambda_function import (
     lambda_handler,
+    fetch_with_retry,
+    get_coordinates,
+    get_weather,
     get_outerwear_recommendations
 )
 
 
+class _Ctx:
+    """Minimal stand-in for the Lambda context"""
+    aws_request_id = "test-123"
+
+
+class _FakeFetch:
+    """Returns queued responses in order and fails on any extra call"""
+
+    def __init__(self, *responses):
+        self.responses = responses
+        self.call_count = 0
+
+    def __call__(self, url):
+        if self.call_count >= len(self.responses):
+            raise AssertionError(f"Unexpected upstream call: {url}")
+        self.call_count += 1
+        return self.responses[self.call_count - 1]
+
+
+class _FakeHttp:
+    """Stand-in for the urllib3 pool that answers every request itself"""
+
+    def __init__(self, status, data):
+        self.status = status
+        self.data = data
+
+    def request(self, method, url, timeout=None):
+        return self
+
+
 class TestWeatherLambda(unittest.TestCase):
     """Essential tests for weather Lambda function"""
 
     def setUp(self):
         """Set up test fixtures"""
-        self.mock_context = MagicMock(aws_request_id="test-123")
+        self.context = _Ctx()
+        self._fetch_with_retry = lambda_function.fetch_with_retry
+        self._http = lambda_function._http
+        lambda_function._geocode.cache_clear()
+        lambda_function._weather_cache.clear()
+
+    def tearDown(self):
+        """Restore module attributes replaced by tests"""
+        lambda_function.fetch_with_retry = self._fetch_with_retry
+        lambda_function._http = self._http
 
     def test_missing_city_parameter(self):
         """Should return 400 when city parameter is missing"""
         event = {"queryStringParameters": {}}
 
-        result = lambda_handler(event, self.mock_context)
+        result = lambda_handler(event, self.context)
 
         self.assertEqual(result["statusCode"], 400)
         body = json.loads(result["body"])
@@ -34,29 +77,27 @@ class TestWeatherLambda(unittest.TestCase):
         """Should return 400 when city name exceeds 100 characters"""
         event = {"queryStringParameters": {"city": "A" * 101}}
 
-        result = lambda_handler(event, self.mock_context)
+        result = lambda_handler(event, self.context)
 
         self.assertEqual(result["statusCode"], 400)
         body = json.loads(result["body"])
         self.assertIn("too long", body["error"])
 
-    @patch('lambda_function.fetch_with_retry')
-    def test_city_not_found(self, mock_fetch):
+    def test_city_not_found(self):
         """Should return 404 when city is not found"""
-        mock_fetch.return_value = {"results": []}
+        lambda_function.fetch_with_retry = _FakeFetch({"results": []})
 
         event = {"queryStringParameters": {"city": "InvalidCity999"}}
-        result = lambda_handler(event, self.mock_context)
+        result = lambda_handler(event, self.context)
 
         self.assertEqual(result["statusCode"], 404)
         body = json.loads(result["body"])
         self.assertIn("City not found", body["error"])
 
-    @patch('lambda_function.fetch_with_retry')
-    def test_successful_weather_request(self, mock_fetch):
+    def test_successful_weather_request(self):
         """Should return 200 with recommendations for valid request"""
-        # Mock geocoding response, then weather response
-        mock_fetch.side_effect = [
+        # Fake geocoding response, then weather response
+        fake_fetch = _FakeFetch(
             {
                 "results": [{
                     "name": "Toronto",
@@ -71,17 +112,82 @@ class TestWeatherLambda(unittest.TestCase):
                     "precipitation_probability": 10
                 }
             }
-        ]
+        )
+        lambda_function.fetch_with_retry = fake_fetch
 
         event = {"queryStringParameters": {"city": "Toronto"}}
-        result = lambda_handler(event, self.mock_context)
+        result = lambda_handler(event, self.context)
 
         self.assertEqual(result["statusCode"], 200)
+        self.assertEqual(fake_fetch.call_count, 2)
         body = json.loads(result["body"])
         self.assertTrue(body["success"])
         self.assertEqual(body["data"]["location"], "Toronto, Canada")
         self.assertIn("winter coat", body["data"]["outerwearRecommended"])
 
+    def test_coordinates_cached_per_city(self):
+        """Should geocode a city once regardless of case or whitespace"""
+        fake_fetch = _FakeFetch({
+            "results": [{
+                "name": "Toronto",
+                "country": "Canada",
+                "latitude": 43.7,
+                "longitude": -79.42
+            }]
+        })
+        lambda_function.fetch_with_retry = fake_fetch
+
+        first = get_coordinates("Toronto")
+        second = get_coordinates("  toronto ")
+
+        self.assertEqual(first, second)
+        self.assertEqual(fake_fetch.call_count, 1)
+
+    def test_weather_cached_until_ttl_expires(self):
+        """Should reuse weather for nearby coordinates until the TTL expires"""
+        weather_response = {
+            "current": {
+                "temperature_2m": 5,
+                "precipitation_probability": 10
+            }
+        }
+        fake_fetch = _FakeFetch(weather_response, weather_response)
+        lambda_function.fetch_with_retry = fake_fetch
+
+        get_weather(43.7001, -79.4201)
+        get_weather(43.7, -79.42)
+        self.assertEqual(fake_fetch.call_count, 1)
+
+        # Age the cached entry past the TTL
+        key = (43.7, -79.42)
+        fetched_at, weather = lambda_function._weather_cache[key]
+        lambda_function._weather_cache[key] = (
+            fetched_at - lambda_function.WEATHER_CACHE_TTL, weather
+        )
+        get_weather(43.7, -79.42)
+        self.assertEqual(fake_fetch.call_count, 2)
+
+    def test_fetch_parses_json_body(self):
+        """Should parse the JSON payload of a successful response"""
+        lambda_function._http = _FakeHttp(200, b'{"results": []}')
+
+        data = fetch_with_retry("https://example.com")
+
+        self.assertEqual(data, {"results": []})
+
+    def test_fetch_raises_on_http_error(self):
+        """Should raise HTTPError for error statuses instead of parsing them"""
+        lambda_function._http = _FakeHttp(404, b'{"error": true}')
+
+        with self.assertRaises(urllib3.exceptions.HTTPError):
+            fetch_with_retry("https://example.com")
+
+    def test_retry_policy_allows_max_retries_attempts(self):
+        """Should make MAX_RETRIES attempts in total"""
+        retries = lambda_function._http.connection_pool_kw["retries"]
+
+        self.assertEqual(retries.total + 1, lambda_function.MAX_RETRIES)
+
     def test_outerwear_winter_coat(self):
         """Should recommend winter coat for freezing temperatures"""
         recommendations = get_outerwear_recommendations(-5, 20)
@@ -107,6 +213,48 @@ class TestWeatherLambda(unittest.TestCase):
 
         self.assertIn("rain jacket", recommendations)
 
+    def test_outerwear_all_outcomes(self):
+        """Should return the exact tuple for every band and rain pairing"""
+        cases = [
+            (-5, 10, ("winter coat",)),
+            (-5, 60, ("winter coat", "rain jacket")),
+            (5, 10, ("light jacket",)),
+            (5, 60, ("light jacket", "rain jacket")),
+            (12, 10, ("hoodie",)),
+            (12, 60, ("hoodie", "rain jacket")),
+            (20, 10, ()),
+            (20, 60, ("rain jacket",)),
+        ]
+        for temperature, precipitation, expected in cases:
+            with self.subTest(temp=temperature, precip=precipitation):
+                self.assertEqual(
+                    get_outerwear_recommendations(temperature, precipitation),
+                    expected
+                )
+
+    def test_outerwear_temperature_boundaries(self):
+        """Should switch bands exactly at 0, 10 and 16°C"""
+        cases = [
+            (-0.01, ("winter coat",)),
+            (0, ("light jacket",)),
+            (10, ("hoodie",)),
+            (16, ()),
+        ]
+        for temperature, expected in cases:
+            with self.subTest(temperature=temperature):
+                self.assertEqual(
+                    get_outerwear_recommendations(temperature, 10), expected
+                )
+
+    def test_outerwear_rain_threshold(self):
+        """Should add a rain jacket only above 40% precipitation"""
+        cases = [(40, ()), (41, ("rain jacket",)), (None, ())]
+        for precipitation, expected in cases:
+            with self.subTest(precipitation=precipitation):
+                self.assertEqual(
+                    get_outerwear_recommendations(20, precipitation), expected
+                )
+
     def test_outerwear_none_for_warm_weather(self):
         """Should recommend nothing for warm weather"""
         recommendations = get_outerwear_recommendations(20, 10)